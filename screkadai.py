@@ -1,17 +1,28 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import random
+import aiohttp
+from selectolax.lexbor import LexborHTMLParser
 import sqlite3
-import time
 import sys
 #コード全体の改善をお願い。
 # 設定
 DB_NAME = 'repos.db'
 BASE_URL = 'https://github.com/google?tab=repositories'
 TARGET_PAGES = 1  # デモ用に最初の1ページのみスクレイピング（APIなしでのページネーションは複雑なため）
+HEADERS = {'User-Agent': 'Mozilla/5.0', 'Accept-Encoding': 'gzip, deflate'}
+MAX_CONCURRENCY = 4  # 同時に取得するページ数の上限
+# 一時的な5xxや接続エラーは指数バックオフ＋ジッターでリトライする
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = {500, 502, 503, 504}
+ROW_FMT = "{:<5} {:<40} {:<20} {:<10}".format  # 表示用の行テンプレート
 
 def init_db():
     """SQLiteデータベースを初期化する"""
     conn = sqlite3.connect(DB_NAME)
+    # 一括挿入のスループット向上のため WAL モードを使う
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS repositories (
@@ -24,85 +35,133 @@ def init_db():
     conn.commit()
     return conn
 
-def scrape_repos(conn):
-    """リポジトリをスクレイピングしてDBに保存する"""
-    cursor = conn.cursor()
-    
-    for page in range(1, TARGET_PAGES + 1):
-        url = f"{BASE_URL}&page={page}"
-        print(f"Scraping {url}...")
+def find_container(node):
+    """名前タグを含むリポジトリ項目（<li>、なければ div.col-12）を探す"""
+    fallback = None
+    parent = node.parent
+    while parent is not None:
+        if parent.tag == 'li':
+            return parent
+        if fallback is None and parent.tag == 'div' and 'col-12' in (parent.attributes.get('class') or '').split():
+            fallback = parent
+        parent = parent.parent
+    # 構造が異なる場合（例：divリスト）のフォールバック
+    return fallback
+
+def parse_repos(html):
+    """ページのHTMLから (名前, 言語, スター数) のリストを取り出す"""
+    # C実装の selectolax (lexbor) で解析する（バイト列のまま渡せる）
+    tree = LexborHTMLParser(html)
+    rows = []
+
+    # 確実に存在する名前タグですべてのリポジトリ項目を見つける
+    # これを基準に親の<li>や<div>を見つけることができる
+    name_tags = tree.css('a[itemprop="name codeRepository"]')
+
+    for name_tag in name_tags:
+        repo_name = name_tag.text(strip=True)
         
-        try:
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Error fetching {url}: {e}")
+        repo_item = find_container(name_tag)
+
+        if repo_item is None:
+            print(f"Could not find container for {repo_name}")
             continue
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # 言語
+        lang_tag = repo_item.css_first('span[itemprop="programmingLanguage"]')
+        language = lang_tag.text(strip=True) if lang_tag is not None else "Unknown"
         
-        # 確実に存在する名前タグですべてのリポジトリ項目を見つける
-        # これを基準に親の<li>や<div>を見つけることができる
-        name_tags = soup.find_all('a', itemprop='name codeRepository')
+        # スター数
+        # /stargazers で終わるリンクを探す
+        star_tag = repo_item.css_first('a[href$="/stargazers"]')
+        stars_count = 0
         
-        if not name_tags:
-            print("No repositories found on this page.")
-            break
-
-        for name_tag in name_tags:
-            repo_name = name_tag.get_text(strip=True)
+        if star_tag is not None:
+            # まずテキストを取得してみる
+            stars_text = star_tag.text(strip=True).replace(',', '')
+            aria_label = star_tag.attributes.get('aria-label')
+            if not stars_text and aria_label:
+                 # フォールバックとして aria-label "455 stars" を使用
+                 stars_text = aria_label.split(' ')[0].replace(',', '')
             
-            # 親の<li>を見つけて
-            repo_item = name_tag.find_parent('li')
-            
-            if not repo_item:
-                # 構造が異なる場合（例：divリスト）のフォールバック
-                repo_item = name_tag.find_parent('div', class_='col-12') 
+            if stars_text:
+                if 'k' in stars_text.lower():
+                    try:
+                        stars_count = int(float(stars_text.lower().replace('k', '')) * 1000)
+                    except ValueError:
+                        stars_count = 0
+                else:
+                    try:
+                        stars_count = int(stars_text)
+                    except ValueError:
+                        stars_count = 0
 
-            if not repo_item:
-                print(f"Could not find container for {repo_name}")
-                continue
+        rows.append((repo_name, language, stars_count))
 
-            # 言語
-            lang_tag = repo_item.find('span', itemprop='programmingLanguage')
-            language = lang_tag.get_text(strip=True) if lang_tag else "Unknown"
-            
-            # スター数
-            # /stargazers で終わるリンクを探す
-            star_tag = repo_item.find('a', href=lambda x: x and x.endswith('/stargazers'))
-            stars_count = 0
-            
-            if star_tag:
-                # まずテキストを取得してみる
-                stars_text = star_tag.get_text(strip=True).replace(',', '')
-                if not stars_text and star_tag.has_attr('aria-label'):
-                     # フォールバックとして aria-label "455 stars" を使用
-                     stars_text = star_tag['aria-label'].split(' ')[0].replace(',', '')
-                
-                if stars_text:
-                    if 'k' in stars_text.lower():
-                        try:
-                            stars_count = int(float(stars_text.lower().replace('k', '')) * 1000)
-                        except ValueError:
-                            stars_count = 0
-                    else:
-                        try:
-                            stars_count = int(stars_text)
-                        except ValueError:
-                            stars_count = 0
-            
+    return rows
+
+async def fetch_page(session, semaphore, page):
+    """1ページ分を取得・解析する。取得に失敗した場合は None を返す"""
+    url = f"{BASE_URL}&page={page}"
+    async with semaphore:
+        print(f"Scraping {url}...")
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    async with session.get(url) as response:
+                        response.raise_for_status()
+                        html = await response.read()
+                    break
+                except aiohttp.ClientResponseError as e:
+                    error, retryable = e, e.status in RETRY_STATUSES
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error, retryable = e, True
+
+                if not retryable or attempt == MAX_RETRIES:
+                    print(f"Error fetching {url}: {error}")
+                    return None
+                await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, BACKOFF_FACTOR))
+        finally:
+            # 要件: 1秒待機する（同時実行数ごとのレート制限）
+            await asyncio.sleep(1)
+
+    # HTMLの解析はCPU処理なのでイベントループ外で実行する
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, parse_repos, html)
+
+async def fetch_all_pages():
+    """全ページを並行に取得し、ページ順に結果を返す"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout) as session:
+        return await asyncio.gather(
+            *(fetch_page(session, semaphore, page) for page in range(1, TARGET_PAGES + 1))
+        )
+
+def scrape_repos(conn):
+    """リポジトリをスクレイピングしてDBに保存する"""
+    cursor = conn.cursor()
+    pages = asyncio.run(fetch_all_pages())
+    all_rows = []
+
+    for rows in pages:
+        if rows is None:
+            continue
+
+        if not rows:
+            print("No repositories found on this page.")
+            break
+
+        for repo_name, language, stars_count in rows:
             print(f"  Found: {repo_name} | {language} | {stars_count}")
+        all_rows.extend(rows)
 
-            # DBに挿入
-            cursor.execute('''
-                INSERT INTO repositories (name, language, stars)
-                VALUES (?, ?, ?)
-            ''', (repo_name, language, stars_count))
-        
-        conn.commit()
-        
-        # 要件: 1秒待機する
-        time.sleep(1)
+    # DBに一括挿入し、コミットは最後に1回だけ行う
+    cursor.executemany('''
+        INSERT INTO repositories (name, language, stars)
+        VALUES (?, ?, ?)
+    ''', all_rows)
+    conn.commit()
 
 def display_data(conn):
     """DBからデータを選択して表示する"""
@@ -111,10 +170,11 @@ def display_data(conn):
     cursor.execute("SELECT * FROM repositories")
     rows = cursor.fetchall()
     
-    print(f"{'ID':<5} {'Name':<40} {'Language':<20} {'Stars':<10}")
+    print(ROW_FMT('ID', 'Name', 'Language', 'Stars'))
     print("-" * 80)
-    for row in rows:
-        print(f"{row[0]:<5} {row[1]:<40} {row[2]:<20} {row[3]:<10}")
+    # 行ごとに print せず、まとめて1回で出力する
+    if rows:
+        print("\n".join(ROW_FMT(*row) for row in rows))
 
 def main():
     conn = init_db()